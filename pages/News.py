@@ -261,6 +261,11 @@ def load_default_dashboard() -> None:
         render_featured_grid(top)
         st.divider()
 
+    # Overlapping themes often surface the same story; render each URL once across the
+    # themed sections (the featured headlines above are left unfiltered)
+    seen: set[str] = set()
+    any_rendered = False
+
     # Themed sections (Everything endpoint)
     # Default date window: last 7 days
     to_date = dt.date.today()
@@ -283,7 +288,14 @@ def load_default_dashboard() -> None:
             arts = []
             st.warning(f"{theme}: failed to load ({e})")
 
-        render_section(theme, arts)
+        arts = [a for a in arts if a.get("url") and a["url"] not in seen]
+        seen.update(a["url"] for a in arts)
+        if arts:
+            render_section(theme, arts)
+            any_rendered = True
+
+    if not any_rendered:
+        st.info("No themed articles found for the last week.")
 # ╰─────────────────────────────────────────────────────────────────╯
 
 
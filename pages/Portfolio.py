@@ -11,7 +11,10 @@ Features:
 from __future__ import annotations
 
 # ── Stdlib
-from datetime import datetime, timedelta
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from typing import Any, Dict, List, Mapping
 
 # ── Third-party
@@ -24,6 +27,7 @@ import yfinance as yf
 
 # ── Local
 import utils.ui as ui
+from utils.fetchers import price_cache as pc
 
 
 # ╭─────────────────────────── Constants ───────────────────────────╮
@@ -36,18 +40,39 @@ ANALYST_BUY_THRESHOLD = 0.10
 ANALYST_SELL_THRESHOLD = -0.05
 PORTFOLIO_VALUE_CAP = 100_000
 BENCHMARK_TICKER = "SPY"
+LATEST_PRICE_PERIOD = "5d"  # Covers weekends/holidays when reading the last close
+MAX_FETCH_WORKERS = 16
+
+# Cache TTLs (seconds)
+TTL_PRICES = 60 * 5
+TTL_HISTORY = 60 * 60  # Daily bars; the live price comes from the TTL_PRICES fetchers
+TTL_HISTORY_DISK = 60 * 60 * 6  # On-disk copy of ranges ending today or later (past ranges last a day)
+TTL_INFO = 60 * 60 * 24  # Only company metadata (names) is read from .info
+
+# Transaction ledger columns; categoricals make the per-rerun groupby work on integer codes
+LEDGER_DTYPES = {
+    "timestamp": "datetime64[ns]",
+    "ticker": "category",
+    "action": "category",
+    "quantity": "int32",
+    "price": "float64",
+    "value": "float64",
+}
 # ╰─────────────────────────────────────────────────────────────────╯
 
 
 # ╭─────────────────────────── Session State Management ───────────────────────────╮
 def init_session_state():
-    """Initialize session state for portfolio if not exists."""
-    if "portfolio" not in st.session_state:
-        st.session_state.portfolio = []
+    """Initialize session state for portfolio if not exists (called once per run from main)."""
+    st.session_state.setdefault("portfolio", [])
+    st.session_state.setdefault("portfolio_value_history", [])
     if "transactions" not in st.session_state:
-        st.session_state.transactions = []
-    if "portfolio_value_history" not in st.session_state:
-        st.session_state.portfolio_value_history = []
+        st.session_state.transactions = _empty_transactions()
+
+
+def _empty_transactions() -> pd.DataFrame:
+    """Return an empty, typed transaction ledger."""
+    return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in LEDGER_DTYPES.items()})
 
 
 def add_transaction(ticker: str, action: str, quantity: int, price: float):
@@ -60,70 +85,220 @@ def add_transaction(ticker: str, action: str, quantity: int, price: float):
         "price": price,
         "value": quantity * price
     }
-    st.session_state.transactions.append(transaction)
+    transactions = st.session_state.transactions
+    transactions.loc[len(transactions)] = transaction
+    # Row enlargement falls back to object/int64 columns; restore the ledger dtypes
+    # (trades are rare, reruns that read the ledger are not)
+    st.session_state.transactions = transactions.astype(LEDGER_DTYPES)
+    st.session_state.pop("_holdings_cache", None)
     return transaction
 
 
-def _current_portfolio_value() -> float:
-    """Return current portfolio market value."""
-    holdings_df = get_current_holdings()
+@st.cache_resource(show_spinner=False)
+def _ticker_pool() -> dict[str, tuple[float, yf.Ticker]]:
+    """Return the process-wide symbol -> (created_at, yf.Ticker) pool (survives reruns)."""
+    return {}
+
+
+def _get_ticker(symbol: str) -> yf.Ticker:
+    """Return a shared yf.Ticker, rebuilt once its cached quote is older than TTL_PRICES."""
+    # yf.Ticker memoizes fast_info/info per instance, so pooled objects must age out
+    # or the quote they serve would never move
+    pool = _ticker_pool()
+    now = time.monotonic()
+    entry = pool.get(symbol)
+    if entry is None or now - entry[0] >= TTL_PRICES:
+        entry = (now, yf.Ticker(symbol))
+        pool[symbol] = entry
+    return entry[1]
+
+
+def _clear_market_data_cache() -> None:
+    """Drop cached prices, company info and per-session memos so the next run refetches."""
+    for cached_fn in (_fetch_prices, _fetch_info, _batch_latest_prices):
+        cached_fn.clear()
+    # _fetch_prices sits on the Parquet cache, whose ranges ending today are kept for hours
+    pc.clear_cache()
+    _ticker_pool().clear()
+    for key in ("_holdings_cache", "_chart_cache"):
+        st.session_state.pop(key, None)
+
+
+def _current_portfolio_value(holdings_df: pd.DataFrame | None = None) -> float:
+    """Return current portfolio market value, reusing holdings_df when the caller has it."""
+    if holdings_df is None:
+        holdings_df = get_current_holdings()
     if holdings_df.empty:
         return 0.0
     return float(holdings_df["Market Value"].sum())
 
 
-def _aggregate_share_counts(transactions: List[Mapping[str, Any]]) -> dict[str, int]:
-    """Return net share counts per ticker from transaction history."""
-    holdings: dict[str, int] = {}
-    for txn in transactions:
-        ticker = txn["ticker"]
-        shares = holdings.setdefault(ticker, 0)
-        if txn["action"] == "Buy":
-            holdings[ticker] = shares + txn["quantity"]
-        elif txn["action"] == "Sell":
-            holdings[ticker] = shares - txn["quantity"]
-    return {ticker: qty for ticker, qty in holdings.items() if qty > 0}
+def _aggregate_share_counts(transactions: pd.DataFrame) -> dict[str, int]:
+    """Return net share counts per ticker from the transaction ledger."""
+    if transactions.empty:
+        return {}
+    action = transactions["action"]
+    quantity = transactions["quantity"].to_numpy(dtype=np.int64)
+    signed_qty = pd.Series(
+        np.where(action.eq("Buy").to_numpy(), quantity, np.where(action.eq("Sell").to_numpy(), -quantity, 0)),
+        index=transactions.index,
+    )
+    holdings = signed_qty.groupby(transactions["ticker"], observed=True, sort=False).sum()
+    return holdings[holdings > 0].astype(int).to_dict()
+
+
+@st.cache_data(ttl=TTL_HISTORY, show_spinner=False)
+def _fetch_prices(tickers: tuple[str, ...], start: date, end: date) -> pd.DataFrame:
+    """
+    Download daily (dates x tickers) adjusted closes for a sorted ticker tuple over [start, end).
+
+    Empty or partial downloads raise pc.IncompleteDownloadError (carrying the partial
+    frame) so that one transient failure is not cached for TTL_HISTORY.
+    """
+    # Only Close is used on this page; slicing it before caching keeps 1/6 of the OHLCV payload
+    return pc.download_history(
+        tickers,
+        start,
+        end,
+        field="Close",
+        max_age=TTL_HISTORY_DISK,
+        strict=True,
+        auto_adjust=True,
+        threads=True,
+        group_by="column",
+    )
+
+
+@st.cache_data(ttl=TTL_INFO, show_spinner=False)
+def _fetch_info(ticker: str) -> dict[str, Any]:
+    """Return the yfinance info dict for a ticker (heavy; use for metadata only)."""
+    return _get_ticker(ticker).info or {}
+
+
+@st.cache_data(ttl=TTL_PRICES, show_spinner=False)
+def _batch_latest_prices(tickers: List[str]) -> dict[str, float]:
+    """
+    Return the latest close per ticker from a single batched download.
+
+    Network errors and empty downloads raise instead of returning {}, so Streamlit
+    does not cache the failure for TTL_PRICES; callers catch and fall back.
+    """
+    raw_prices = yf.download(
+        tickers,
+        period=LATEST_PRICE_PERIOD,
+        interval="1d",
+        auto_adjust=True,
+        group_by="column",
+        threads=True,
+        progress=False,
+    )
+    if raw_prices.empty:
+        raise RuntimeError(f"No prices returned for {', '.join(tickers)}")
+    # Last non-NaN close per ticker; tickers the batch missed fall back to fast_info
+    latest = raw_prices["Close"].sort_index().ffill().iloc[-1].dropna()
+    return {ticker: float(price) for ticker, price in latest.items() if price > 0}
+
+
+def _price_from_ticker(stock: yf.Ticker) -> float:
+    """Return the last traded price via the lightweight fast_info endpoint."""
+    price = stock.fast_info.get("last_price")
+    return float(price) if price and np.isfinite(price) else 0.0
 
 
-def _fetch_market_snapshot(ticker: str, quantity: int) -> dict[str, Any] | None:
-    """Fetch current price data for a ticker and compute market value."""
+def _last_price(ticker: str) -> float:
+    """Return the last traded price for a ticker symbol, falling back to .info's currentPrice."""
+    stock = _get_ticker(ticker)
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        current_price = info.get("currentPrice", 0.0)
-        market_value = quantity * current_price
-        return {
-            "Ticker": ticker,
-            "Quantity": quantity,
-            "Current Price": current_price,
-            "Market Value": market_value,
-        }
-    except Exception as exc:  # pragma: no cover - UI feedback only
-        st.warning(f"Could not fetch data for {ticker}: {exc}")
-        return None
+        price = _price_from_ticker(stock)
+    except Exception:  # pragma: no cover - yfinance network issues
+        price = 0.0
+    if price > 0:
+        return price
+    # Some listings have no fast_info quote; only then pay for the full .info payload
+    try:
+        info_price = (stock.info or {}).get("currentPrice")
+    except Exception:  # pragma: no cover - yfinance network issues
+        return 0.0
+    return float(info_price) if info_price and np.isfinite(info_price) else 0.0
+
+
+def _fetch_last_prices(tickers: List[str]) -> dict[str, float]:
+    """Fetch last prices concurrently, warning about (and skipping) failed tickers."""
+    if not tickers:  # a zero-worker pool raises
+        return {}
+    # Ticker objects are resolved up front so workers only do the network-bound reads
+    with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(tickers))) as executor:
+        futures = {ticker: executor.submit(_price_from_ticker, _get_ticker(ticker)) for ticker in tickers}
+
+    prices: dict[str, float] = {}
+    for ticker, future in futures.items():
+        try:
+            prices[ticker] = future.result()
+        except Exception as exc:  # pragma: no cover - UI feedback only
+            st.warning(f"Could not fetch data for {ticker}: {exc}")
+    return prices
 
 
 def get_current_holdings() -> pd.DataFrame:
-    """Return current holdings with latest market values."""
-    init_session_state()
+    """Return current holdings with latest market values, memoized per transaction state."""
+    if st.session_state.transactions.empty:
+        return pd.DataFrame()
+
+    # Several panels ask for holdings on every rerun; rebuild only when the trades change
+    # or the price TTL window rolls over. The ledger is append-only, so its length
+    # identifies the transaction state.
+    cache_key = (len(st.session_state.transactions), int(time.time() // TTL_PRICES))
+    cached = st.session_state.get("_holdings_cache")
+    if cached is not None and cached[0] == cache_key:
+        return cached[1]
+
+    holdings_df = _build_current_holdings()
+    st.session_state["_holdings_cache"] = (cache_key, holdings_df)
+    return holdings_df
+
+
+def _build_current_holdings() -> pd.DataFrame:
+    """Aggregate transactions and price each open position."""
     holdings_map = _aggregate_share_counts(st.session_state.transactions)
     if not holdings_map:
         return pd.DataFrame()
 
-    snapshots = [_fetch_market_snapshot(ticker, qty) for ticker, qty in holdings_map.items()]
-    rows = [snap for snap in snapshots if snap]
-    return pd.DataFrame(rows)
+    # One batched download for every holding; per-ticker lookups only fill the gaps
+    try:
+        prices = _batch_latest_prices(sorted(holdings_map))
+    except Exception:  # pragma: no cover - yfinance network issues
+        prices = {}
+    missing = [ticker for ticker in holdings_map if ticker not in prices]
+    prices = {**prices, **_fetch_last_prices(missing)}
+    tickers = [ticker for ticker in holdings_map if ticker in prices]
+    if not tickers:
+        return pd.DataFrame()
+    # Column arrays straight into the constructor; market value is one vector multiply
+    quantity = np.fromiter((holdings_map[ticker] for ticker in tickers), dtype=np.int64, count=len(tickers))
+    price = np.fromiter((prices[ticker] for ticker in tickers), dtype=np.float64, count=len(tickers))
+    return pd.DataFrame(
+        {
+            "Ticker": tickers,
+            "Quantity": quantity,
+            "Current Price": price,
+            "Market Value": quantity * price,
+        }
+    )
 
 
-def calculate_returns() -> dict:
+def calculate_returns(holdings_df: pd.DataFrame | None = None) -> dict:
     """Return portfolio value series, returns, and summary metrics."""
-    holdings_df = get_current_holdings()
+    if holdings_df is None:
+        holdings_df = get_current_holdings()
     if holdings_df.empty:
         return _empty_returns_payload()
 
-    price_history = _download_price_history(holdings_df["Ticker"].tolist())
+    total_value = _current_portfolio_value(holdings_df)
+    tickers = holdings_df["Ticker"].tolist()
+    # The benchmark rides along in the same download and is split off here
+    all_prices = _download_price_history(tickers, extra=(BENCHMARK_TICKER,))
+    price_history, benchmark_series = _split_benchmark(all_prices, tickers, BENCHMARK_TICKER)
     if price_history.empty:
-        total_value = holdings_df["Market Value"].sum()
         payload = _empty_returns_payload(total_value)
         payload["holdings"] = holdings_df
         payload["price_history"] = price_history
@@ -131,25 +306,37 @@ def calculate_returns() -> dict:
 
     portfolio_values = _build_portfolio_values(holdings_df, price_history)
     if portfolio_values.empty:
-        total_value = holdings_df["Market Value"].sum()
         payload = _empty_returns_payload(total_value)
         payload["holdings"] = holdings_df
         payload["price_history"] = price_history
         return payload
 
-    returns_series = portfolio_values.pct_change().fillna(0)
-    metrics = calculate_portfolio_metrics(returns_series)
+    returns_arr = _simple_returns(portfolio_values.to_numpy(dtype=np.float64))
+    metrics = calculate_portfolio_metrics(returns_arr)
+    returns_series = pd.Series(returns_arr, index=portfolio_values.index)
 
     return {
-        "total_value": holdings_df["Market Value"].sum(),
+        "total_value": total_value,
         "returns_series": returns_series,
         "portfolio_values": portfolio_values,
         "metrics": metrics,
         "holdings": holdings_df,
         "price_history": price_history,
+        "benchmark_series": benchmark_series,
     }
 
 
+def _simple_returns(values: np.ndarray) -> np.ndarray:
+    """Return daily simple returns with a leading 0 (pct_change().fillna(0) on raw arrays)."""
+    returns = np.empty_like(values)
+    returns[0] = 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(values[1:], values[:-1], out=returns[1:])
+    returns[1:] -= 1.0
+    returns[np.isnan(returns)] = 0.0
+    return returns
+
+
 def _empty_returns_payload(total_value: float = 0.0) -> dict:
     """Return a standard payload for missing return data."""
     return {
@@ -159,72 +346,82 @@ def _empty_returns_payload(total_value: float = 0.0) -> dict:
         "metrics": {"CAGR": 0, "Vol": 0, "Sharpe": 0, "MaxDD": 0},
         "holdings": pd.DataFrame(),
         "price_history": pd.DataFrame(),
+        "benchmark_series": pd.Series(dtype=float),
     }
 
 
-def _download_price_history(tickers: List[str]) -> pd.DataFrame:
-    """Download and normalise historical close prices for a list of tickers."""
-    end_date = datetime.now()
+def _download_price_history(tickers: List[str], extra: tuple[str, ...] = ()) -> pd.DataFrame:
+    """Download and normalise historical close prices for tickers plus any extra symbols."""
+    # Day-granular bounds keep the cache key stable across reruns; end is exclusive
+    end_date = date.today() + timedelta(days=1)
     start_date = end_date - timedelta(days=HISTORY_DAYS)
     try:
-        raw_prices = yf.download(tickers, start=start_date, end=end_date, progress=False)
+        close_prices = _fetch_prices(tuple(sorted({*tickers, *extra})), start_date, end_date)
+    except pc.IncompleteDownloadError as exc:  # use what arrived; the rest is retried next rerun
+        close_prices = exc.data
     except Exception:  # pragma: no cover - yfinance network issues
         return pd.DataFrame()
-    if raw_prices.empty:
-        return raw_prices
-    return _normalize_price_history(raw_prices, tickers)
+    if close_prices.empty:
+        return close_prices
+    return _normalize_price_history(close_prices)
+
+
+def _split_benchmark(
+    all_prices: pd.DataFrame,
+    tickers: List[str],
+    benchmark_ticker: str,
+) -> tuple[pd.DataFrame, pd.Series]:
+    """Split a combined close frame into holdings prices and the benchmark series."""
+    if all_prices.empty:
+        return all_prices, pd.Series(dtype=float)
+    benchmark = (
+        all_prices[benchmark_ticker].dropna()
+        if benchmark_ticker in all_prices.columns
+        else pd.Series(dtype=float)
+    )
+    held = [ticker for ticker in dict.fromkeys(tickers) if ticker in all_prices.columns]
+    # Dates where only the benchmark traded would otherwise read as a zero-value portfolio
+    return all_prices[held].dropna(how="all"), benchmark
 
 
-def _normalize_price_history(prices: pd.DataFrame, tickers: List[str]) -> pd.DataFrame:
-    """Return a DataFrame of close prices indexed by date."""
-    if isinstance(prices.columns, pd.MultiIndex):
-        if "Close" in prices.columns.get_level_values(0):
-            close_prices = prices["Close"]
-        else:
-            close_prices = prices.droplevel(0, axis=1)
-    else:
-        close_prices = prices["Close"] if "Close" in prices.columns else prices
-    if isinstance(close_prices, pd.Series):
-        close_prices = close_prices.to_frame(name=tickers[0])
-    elif len(close_prices.columns) == 1 and tickers:
-        close_prices.columns = [tickers[0]]
-    return close_prices.sort_index().dropna(how="all")
+def _normalize_price_history(close_prices: pd.DataFrame) -> pd.DataFrame:
+    """Return a (dates x tickers) close-price DataFrame sorted by date, without empty rows."""
+    # yfinance output is normally sorted and gap-free; only copy when it is not
+    if not close_prices.index.is_monotonic_increasing:
+        close_prices = close_prices.sort_index()
+    has_price = close_prices.notna().to_numpy().any(axis=1)
+    if not has_price.all():
+        close_prices = close_prices.loc[has_price]
+    return close_prices
 
 
 def _build_portfolio_values(holdings_df: pd.DataFrame, price_history: pd.DataFrame) -> pd.Series:
     """Aggregate position values across holdings to produce a portfolio series."""
-    portfolio_series = pd.Series(dtype=float)
-    for _, holding in holdings_df.iterrows():
-        ticker = holding["Ticker"]
-        quantity = holding["Quantity"]
-        if ticker not in price_history.columns:
-            continue
-        ticker_values = price_history[ticker] * quantity
-        portfolio_series = ticker_values if portfolio_series.empty else portfolio_series.add(ticker_values, fill_value=0)
-    return portfolio_series.sort_index()
-
-
-def calculate_portfolio_metrics(returns: pd.Series) -> dict:
+    held = holdings_df[holdings_df["Ticker"].isin(price_history.columns)]
+    if held.empty:
+        return pd.Series(dtype=float)
+    # (T, H) close matrix @ (H,) share vector: one BLAS call instead of a per-holding align/add
+    close = price_history[held["Ticker"]].fillna(0.0).to_numpy(dtype=np.float64)
+    quantities = held["Quantity"].to_numpy(dtype=np.float64)
+    # price_history arrives date-sorted from _normalize_price_history, so no re-sort
+    return pd.Series(close @ quantities, index=price_history.index)
+
+
+def calculate_portfolio_metrics(returns: pd.Series | np.ndarray) -> dict:
     """Calculate portfolio performance metrics."""
-    if returns.empty or len(returns) < 2:
+    ret = np.asarray(returns, dtype=np.float64)
+    if ret.size < 2:
         return {"CAGR": 0, "Vol": 0, "Sharpe": 0, "MaxDD": 0}
     
-    ret = returns.dropna()
+    # Copy only when there is something to drop; returns from _simple_returns are NaN-free
+    nan_mask = np.isnan(ret)
+    if nan_mask.any():
+        ret = ret[~nan_mask]
     
-    if ret.empty:
+    if ret.size == 0:
         return {"CAGR": 0, "Vol": 0, "Sharpe": 0, "MaxDD": 0}
     
-    # Annualized metrics
-    days = len(ret)
-    cagr = (1 + ret).prod() ** (252 / days) - 1 if days > 0 else 0
-    vol = ret.std() * np.sqrt(252) if len(ret) > 1 else 0
-    sharpe = (cagr - RISK_FREE_RATE) / vol if vol != 0 else 0
-    
-    # Max drawdown
-    curve = (1 + ret).cumprod()
-    peak = curve.cummax()
-    dd = (curve / peak - 1).min()
-    
+    cagr, vol, sharpe, dd = _metrics_kernel(ret, RISK_FREE_RATE)
     return {
         "CAGR": cagr,
         "Vol": vol,
@@ -233,6 +430,22 @@ def calculate_portfolio_metrics(returns: pd.Series) -> dict:
     }
 
 
+def _metrics_kernel(ret: np.ndarray, rf: float) -> tuple[float, float, float, float]:
+    """Return CAGR, volatility, Sharpe and max drawdown for a clean daily return array."""
+    days = ret.size
+    # One equity curve, built in a single buffer, feeds both the CAGR (its last point)
+    # and the drawdown
+    curve = np.add(ret, 1.0)
+    np.cumprod(curve, out=curve)
+    cagr = float(curve[-1] ** (252 / days) - 1)
+    vol = float(ret.std(ddof=1) * np.sqrt(252)) if days > 1 else 0.0
+    sharpe = (cagr - rf) / vol if vol != 0 else 0.0
+    peak = np.maximum.accumulate(curve)
+    # Subtract 1 once from the minimum ratio rather than from every element
+    max_dd = float(np.min(np.divide(curve, peak, out=peak)) - 1.0)
+    return cagr, vol, sharpe, max_dd
+
+
 # ╰─────────────────────────────────────────────────────────────────╯
 
 
@@ -241,6 +454,8 @@ def render_header() -> None:
     """Configure page header and layout."""
     ui.configure_page(page_title="Portfolio Management", page_icon="💼", layout="wide")
     ui.render_sidebar()
+    if st.sidebar.button("🔄 Refresh market data", use_container_width=True):
+        _clear_market_data_cache()
 
 
 def render_stock_chart(ticker: str) -> None:
@@ -248,13 +463,12 @@ def render_stock_chart(ticker: str) -> None:
     if not ticker:
         st.info("Enter or select a ticker to view chart")
         return
-    close_prices = _load_stock_close_series(ticker)
-    if close_prices is None or close_prices.empty:
+    chart = _stock_chart_payload(ticker)
+    if chart is None:
         st.warning(f"No data available for {ticker}")
         return
 
-    company_name, current_price, analyst_signal, signal_delta = _fetch_stock_metadata(ticker, close_prices)
-    figure = _create_stock_chart_figure(ticker, company_name, close_prices, current_price)
+    figure, current_price, analyst_signal, signal_delta = chart
     st.plotly_chart(figure, use_container_width=True)
 
     if current_price > 0:
@@ -262,28 +476,46 @@ def render_stock_chart(ticker: str) -> None:
     st.metric("Analyst Signal", analyst_signal, signal_delta or None)
 
 
+def _stock_chart_payload(ticker: str) -> tuple[go.Figure, float, str, str] | None:
+    """Return chart figure and price/signal metadata, reusing the last build for the same ticker."""
+    # Every widget change in the Trade tab reruns the script; rebuild (and hit the network)
+    # only when the displayed ticker changes or the price TTL window rolls over
+    cache_key = (ticker, int(time.time() // TTL_PRICES))
+    cached = st.session_state.get("_chart_cache")
+    if cached is not None and cached[0] == cache_key:
+        return cached[1]
+
+    close_prices = _load_stock_close_series(ticker)
+    if close_prices is None or close_prices.empty:
+        return None
+
+    company_name, current_price, analyst_signal, signal_delta = _fetch_stock_metadata(ticker, close_prices)
+    figure = _create_stock_chart_figure(ticker, company_name, close_prices, current_price)
+    payload = (figure, current_price, analyst_signal, signal_delta)
+    st.session_state["_chart_cache"] = (cache_key, payload)
+    return payload
+
+
 def _load_stock_close_series(ticker: str) -> pd.Series | None:
     """Download and prepare close price series for a ticker."""
     try:
-        end_date = datetime.now()
+        end_date = date.today() + timedelta(days=1)
         start_date = end_date - timedelta(days=CHART_HISTORY_DAYS)
-        raw_data = yf.download(ticker, start=start_date, end=end_date, progress=False)
+        close_prices = _fetch_prices((ticker,), start_date, end_date)
+    except pc.IncompleteDownloadError:  # nothing to chart; not cached, so retried next rerun
+        return None
     except Exception as exc:  # pragma: no cover - yfinance network issues
         st.error(f"Error loading chart for {ticker}: {exc}")
         return None
 
-    if raw_data.empty:
+    if close_prices.empty:
         return None
 
-    if isinstance(raw_data.columns, pd.MultiIndex):
-        close_prices = raw_data["Close"]
-        close_series = close_prices.iloc[:, 0]
-    elif "Close" in raw_data.columns:
-        close_series = raw_data["Close"]
-    else:
-        close_series = raw_data.iloc[:, 0]
-
-    close_series = close_series.sort_index().dropna()
+    close_series = close_prices.squeeze("columns")
+    if not close_series.index.is_monotonic_increasing:
+        close_series = close_series.sort_index()
+    if close_series.hasnans:
+        close_series = close_series.dropna()
     if hasattr(close_series.index, "tz") and close_series.index.tz is not None:
         close_series.index = close_series.index.tz_localize(None)
     return close_series.astype(float)
@@ -291,11 +523,10 @@ def _load_stock_close_series(ticker: str) -> pd.Series | None:
 
 def _fetch_stock_metadata(ticker: str, close_prices: pd.Series) -> tuple[str, float, str, str]:
     """Return company name, current price, and analyst signal for ticker."""
-    stock = yf.Ticker(ticker)
-    info = stock.info
+    stock = _get_ticker(ticker)
     fallback_price = close_prices.iloc[-1] if not close_prices.empty else 0.0
-    current_price = info.get("currentPrice", fallback_price)
-    company_name = info.get("longName", ticker)
+    current_price = _last_price(ticker) or fallback_price
+    company_name = _fetch_info(ticker).get("longName", ticker)
     try:
         price_targets = stock.analyst_price_targets
     except Exception:  # pragma: no cover - optional data
@@ -336,10 +567,12 @@ def _create_stock_chart_figure(
 ) -> go.Figure:
     """Create a Plotly figure for stock price history."""
     fig = go.Figure()
+    # Raw arrays are base64-encoded for Plotly.js; float32 halves the payload and is ample
+    # precision for cents on a price chart
     fig.add_trace(
         go.Scatter(
-            x=pd.to_datetime(close_prices.index),
-            y=close_prices.values,
+            x=close_prices.index.to_numpy(),
+            y=close_prices.to_numpy(dtype=np.float32),
             mode="lines",
             name=ticker,
             line=dict(width=2, color="#1f77b4"),
@@ -348,7 +581,7 @@ def _create_stock_chart_figure(
     )
 
     if current_price > 0 and not close_prices.empty:
-        last_date = pd.to_datetime(close_prices.index[-1])
+        last_date = close_prices.index[-1]
         fig.add_trace(
             go.Scatter(
                 x=[last_date],
@@ -373,17 +606,21 @@ def _create_stock_chart_figure(
     return fig
 
 
+@st.fragment
 def render_trade_panel() -> None:
-    """Render buy/sell trading panel."""
+    """Render buy/sell trading panel (a fragment: form edits rerun only this panel)."""
     st.header("💰 Trade")
     st.caption("Buy or sell stocks to manage your portfolio")
-    
+    notice = st.session_state.pop("_trade_notice", None)
+    if notice:
+        st.success(notice)
+
     col_actions, col_chart = st.columns(2, gap="large")
 
     with col_actions:
         _render_buy_form()
-        holdings_df = get_current_holdings()
-        _render_sell_form(holdings_df)
+        # Share counts come straight from the ledger: no pricing needed to sell
+        _render_sell_form(_aggregate_share_counts(st.session_state.transactions))
 
     with col_chart:
         st.subheader("📈 Stock Chart")
@@ -407,35 +644,34 @@ def _render_buy_form() -> None:
 def _handle_buy_order(ticker: str, quantity: int) -> None:
     """Execute a buy order and provide user feedback."""
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        current_price = info.get("currentPrice", 0.0)
+        current_price = _last_price(ticker)
         if current_price <= 0:
             st.error("Could not fetch current price for this ticker.")
             return
+        # Holdings are only priced when a buy needs the portfolio-cap check
         projected_value = _current_portfolio_value() + current_price * quantity
         if projected_value > PORTFOLIO_VALUE_CAP:
             st.error(f"Trade exceeds portfolio cap of ${PORTFOLIO_VALUE_CAP:,.0f}.")
             return
         add_transaction(ticker, "Buy", quantity, current_price)
-        st.success(f"✅ Bought {quantity} shares of {ticker} at ${current_price:.2f}")
+        _finish_trade(f"✅ Bought {quantity} shares of {ticker} at ${current_price:.2f}")
     except Exception as exc:  # pragma: no cover - network dependent
         st.error(f"Error fetching data for {ticker}: {exc}")
 
 
-def _render_sell_form(holdings_df: pd.DataFrame) -> None:
+def _render_sell_form(share_counts: Mapping[str, int]) -> None:
     """Render form to submit sell orders."""
     st.subheader("Sell Stock")
-    if holdings_df.empty:
+    if not share_counts:
         st.info("No holdings to sell.")
         return
 
-    sell_tickers = holdings_df["Ticker"].tolist()
+    sell_tickers = list(share_counts)
     sell_ticker = st.selectbox("Select Ticker", sell_tickers, key="sell_ticker")
     if not sell_ticker:
         return
 
-    max_quantity = int(holdings_df.loc[holdings_df["Ticker"] == sell_ticker, "Quantity"].iloc[0])
+    max_quantity = share_counts[sell_ticker]
     sell_quantity = st.number_input(
         "Quantity",
         min_value=1,
@@ -455,18 +691,22 @@ def _handle_sell_order(ticker: str, quantity: int, max_quantity: int) -> None:
         return
 
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        current_price = info.get("currentPrice", 0.0)
+        current_price = _last_price(ticker)
         if current_price <= 0:
             st.error("Could not fetch current price for this ticker.")
             return
         add_transaction(ticker, "Sell", quantity, current_price)
-        st.success(f"✅ Sold {quantity} shares of {ticker} at ${current_price:.2f}")
+        _finish_trade(f"✅ Sold {quantity} shares of {ticker} at ${current_price:.2f}")
     except Exception as exc:  # pragma: no cover - network dependent
         st.error(f"Error fetching data for {ticker}: {exc}")
 
 
+def _finish_trade(message: str) -> None:
+    """Rerun the whole page after a trade so the other tabs see it, keeping the confirmation."""
+    st.session_state["_trade_notice"] = message
+    st.rerun(scope="app")  # ScriptControlException is not caught by the handlers' except Exception
+
+
 def _determine_display_ticker() -> str | None:
     """Return ticker to display in the chart based on recent user actions."""
     buy_ticker = st.session_state.get("buy_ticker")
@@ -476,18 +716,16 @@ def _determine_display_ticker() -> str | None:
     return sell_ticker
 
 
-def render_holdings_panel() -> None:
+def render_holdings_panel(holdings_df: pd.DataFrame) -> None:
     """Display current portfolio holdings."""
     st.header("📊 Current Holdings")
     
-    holdings_df = get_current_holdings()
-    
     if holdings_df.empty:
         st.info("📭 Your portfolio is empty. Start by buying some stocks!")
         return
     
     # Display summary metrics
-    total_value = holdings_df["Market Value"].sum()
+    total_value = _current_portfolio_value(holdings_df)
     st.metric("Total Portfolio Value", f"${total_value:,.2f}")
     
     # Display holdings table
@@ -509,11 +747,16 @@ def render_holdings_panel() -> None:
         st.plotly_chart(fig_pie, use_container_width=True)
 
 
-def render_performance_panel() -> None:
+def render_performance_panel(holdings_df: pd.DataFrame) -> None:
     """Display portfolio performance metrics and charts."""
     st.header("📈 Performance Analysis")
     
-    portfolio_data = calculate_returns()
+    # Nothing to analyse: skip the history download entirely
+    if holdings_df.empty:
+        st.info("Add holdings to see performance metrics.")
+        return
+
+    portfolio_data = calculate_returns(holdings_df)
     
     if portfolio_data["total_value"] == 0:
         st.info("Add holdings to see performance metrics.")
@@ -538,7 +781,7 @@ def render_performance_panel() -> None:
         _render_risk_return_chart(price_history)
 
     if not portfolio_values.empty:
-        _render_portfolio_vs_benchmark_chart(portfolio_values)
+        _render_portfolio_vs_benchmark_chart(portfolio_values, portfolio_data["benchmark_series"])
 
     
 
@@ -572,7 +815,12 @@ def _render_portfolio_value_chart(portfolio_values: pd.Series) -> None:
 def _render_cumulative_returns_chart(returns_series: pd.Series) -> None:
     """Render cumulative returns chart."""
     st.subheader("Cumulative Returns")
-    cum_returns = (1 + returns_series).cumprod() - 1
+    # Compound in one buffer instead of allocating a temporary per operator
+    cum_arr = returns_series.to_numpy(dtype=np.float64, copy=True)
+    cum_arr += 1.0
+    np.cumprod(cum_arr, out=cum_arr)
+    cum_arr -= 1.0
+    cum_returns = pd.Series(cum_arr, index=returns_series.index)
     fig_cum = px.line(
         x=cum_returns.index,
         y=cum_returns.values,
@@ -604,14 +852,18 @@ def _render_risk_return_chart(price_history: pd.DataFrame) -> None:
     returns = price_history.pct_change().dropna(how="all")
     if returns.empty:
         return
-    mean_daily = returns.mean()
-    annual_return = (1 + mean_daily).pow(252) - 1
-    annual_vol = returns.std() * np.sqrt(252)
+    # Column-wise NaN-aware moments on the raw array; tickers with too little history
+    # come out as NaN (warnings silenced) and are dropped below
+    daily = returns.to_numpy(dtype=np.float64)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean_daily = np.nanmean(daily, axis=0)
+        std_daily = np.nanstd(daily, axis=0, ddof=1)
     scatter_df = pd.DataFrame(
         {
-            "Ticker": annual_return.index,
-            "Return": annual_return.values,
-            "Volatility": annual_vol.reindex_like(annual_return).values,
+            "Ticker": returns.columns,
+            "Return": (1.0 + mean_daily) ** 252 - 1.0,
+            "Volatility": std_daily * np.sqrt(252),
         }
     ).dropna()
     if scatter_df.empty:
@@ -632,24 +884,22 @@ def _render_risk_return_chart(price_history: pd.DataFrame) -> None:
 
 def _render_portfolio_vs_benchmark_chart(
     portfolio_values: pd.Series,
+    benchmark_series: pd.Series,
     benchmark_ticker: str = BENCHMARK_TICKER,
 ) -> None:
     """Render normalized performance of portfolio versus benchmark."""
-    if portfolio_values.empty:
-        return
-    benchmark_series = _fetch_benchmark_series(benchmark_ticker, portfolio_values.index)
-    if benchmark_series.empty or benchmark_series.iloc[0] == 0:
+    if portfolio_values.empty or benchmark_series.empty:
         return
-    portfolio_norm = portfolio_values / portfolio_values.iloc[0] * 100
-    benchmark_norm = benchmark_series / benchmark_series.iloc[0] * 100
-    comparison = pd.DataFrame(
+    aligned = pd.DataFrame(
         {
-            "Portfolio": portfolio_norm,
-            benchmark_ticker: benchmark_norm.reindex(portfolio_norm.index, method="ffill"),
+            "Portfolio": portfolio_values,
+            benchmark_ticker: benchmark_series.reindex(portfolio_values.index, method="ffill"),
         }
     ).dropna()
-    if comparison.empty:
+    # Rebase after alignment so both lines start at 100 on the first shared date
+    if aligned.empty or (aligned.iloc[0] == 0).any():
         return
+    comparison = _rebase_to_100(aligned)
     st.subheader(f"Portfolio vs {benchmark_ticker}")
     fig = px.line(
         comparison,
@@ -662,37 +912,23 @@ def _render_portfolio_vs_benchmark_chart(
     st.plotly_chart(fig, use_container_width=True)
 
 
-def _fetch_benchmark_series(benchmark_ticker: str, index: pd.Index) -> pd.Series:
-    """Fetch benchmark close prices aligned with portfolio date range."""
-    if index.empty:
-        return pd.Series(dtype=float)
-    start_date = index.min()
-    end_date = index.max() + timedelta(days=1)
-    try:
-        data = yf.download(benchmark_ticker, start=start_date, end=end_date, progress=False)
-    except Exception:  # pragma: no cover - yfinance network issues
-        return pd.Series(dtype=float)
-    if data.empty:
-        return pd.Series(dtype=float)
-    if isinstance(data.columns, pd.MultiIndex):
-        benchmark = data["Close"].iloc[:, 0]
-    elif "Close" in data.columns:
-        benchmark = data["Close"]
-    else:
-        benchmark = data.iloc[:, 0]
-    return benchmark.sort_index().dropna()
+def _rebase_to_100(frame: pd.DataFrame) -> pd.DataFrame:
+    """Return columns indexed to 100 at their first row, scaled in a single buffer."""
+    values = frame.to_numpy(dtype=np.float64, copy=True)
+    values *= 100.0 / values[0]
+    return pd.DataFrame(values, index=frame.index, columns=frame.columns)
 
 
 def render_transaction_history() -> None:
     """Display transaction history."""
     st.header("📜 Transaction History")
     
-    if not st.session_state.transactions:
+    if st.session_state.transactions.empty:
         st.info("No transactions yet.")
         return
     
-    transactions_df = pd.DataFrame(st.session_state.transactions)
-    transactions_df = transactions_df.sort_values("timestamp", ascending=False)
+    # Appends arrive in time order, so newest-first is a reversed view rather than a sort
+    transactions_df = st.session_state.transactions.iloc[::-1]
     
     st.dataframe(
         transactions_df,
@@ -716,11 +952,15 @@ def main() -> None:
     with tab1:
         render_trade_panel()
 
+    # Typing in the trade forms reruns only that fragment, so the history download
+    # below runs on page loads and after trades (which rerun the full app)
+    holdings_df = get_current_holdings()
+
     with tab2:
-        render_holdings_panel()
+        render_holdings_panel(holdings_df)
 
     with tab3:
-        render_performance_panel()
+        render_performance_panel(holdings_df)
 
     with tab4:
         render_transaction_history()
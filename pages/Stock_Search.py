@@ -10,6 +10,7 @@ Features:
 from __future__ import annotations
 
 # ── Stdlib
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import date, datetime
 from typing import Optional
 
@@ -19,9 +20,11 @@ import plotly.graph_objects as go
 import streamlit as st
 import yfinance as yf
 import numpy as np
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # ── Local
 import utils.ui as ui
+from utils.fetchers import price_cache as pc
 
 
 # ╭─────────────────────────── Constants ───────────────────────────╮
@@ -33,99 +36,170 @@ DEFAULT_BENCHMARK = "SPY"
 MAX_BENCHMARKS = 5
 ANALYST_BUY_THRESHOLD = 0.10
 ANALYST_SELL_THRESHOLD = -0.05
+EXTENDED_FETCH_WORKERS = 8
+WEBGL_MIN_POINTS = 2000  # Charts with more points (all traces) render via WebGL instead of SVG
+MAX_TRACE_POINTS = 2000  # Longer series are downsampled (LTTB) before plotting
+
+# Cache TTLs (seconds)
+TTL_HISTORY = 60 * 60
+TTL_INFO = 60 * 60
+HISTORY_CACHE_ENTRIES = 32  # Shared batch frames kept in memory across sessions
 # ╰─────────────────────────────────────────────────────────────────╯
 
 
 # ╭──────────────────────── Helpers and caching ──────────────────────╮
-def get_stock_data(ticker_symbol: str, start_date: date, end_date: date) -> Optional[pd.DataFrame]:
+@st.cache_resource(ttl=TTL_INFO, show_spinner=False)
+def _ticker(symbol: str) -> yf.Ticker:
+    """Return a shared yf.Ticker for a symbol so page sections reuse one object and session."""
+    return yf.Ticker(symbol)
+
+
+@st.cache_resource(ttl=TTL_HISTORY, max_entries=HISTORY_CACHE_ENTRIES, show_spinner=False)
+def _download_stock_batch(tickers: tuple[str, ...], start_date: date, end_date: date) -> pd.DataFrame:
+    """
+    Download daily OHLCV for several tickers in one request, grouped by ticker.
+
+    Cached in memory and on disk. The in-memory frame is shared rather than
+    copied per rerun, so callers must treat it as read-only. Empty or partial
+    downloads raise pc.IncompleteDownloadError, which Streamlit does not cache.
     """
-    Fetch historical stock data from Yahoo Finance for a given ticker.
-    
+    # The Parquet copy survives app restarts. The default search ends today, so it is
+    # refreshed after TTL_HISTORY
+    raw = pc.download_history(
+        tickers, start_date, end_date, max_age=TTL_HISTORY, strict=True, group_by="ticker", threads=True
+    )
+    return _naive_index(raw)
+
+
+def _naive_index(raw: pd.DataFrame) -> pd.DataFrame:
+    """Drop the time zone from a datetime index in place and return the frame."""
+    if pd.api.types.is_datetime64_any_dtype(raw.index):
+        raw.index = raw.index.tz_localize(None)
+    return raw
+
+
+@st.cache_data(ttl=TTL_INFO, show_spinner=False)
+def get_ticker_info(ticker: str) -> dict:
+    """Return the yfinance info dict for a ticker (cached; one request per TTL)."""
+    return _ticker(ticker).info or {}
+
+
+@st.cache_data(ttl=TTL_INFO, show_spinner=False)
+def _fetch_price_targets(ticker: str) -> Optional[pd.DataFrame]:
+    """Return analyst price targets for a ticker (cached)."""
+    raw_targets = getattr(_ticker(ticker), "analyst_price_targets", None)
+    return _to_standard_frame(raw_targets) if raw_targets is not None else None
+
+
+@st.cache_data(ttl=TTL_INFO, show_spinner=False)
+def _fetch_calendar(ticker: str) -> Optional[pd.DataFrame]:
+    """Return the upcoming events calendar for a ticker (cached)."""
+    return _to_standard_frame(getattr(_ticker(ticker), "calendar", None))
+
+
+@st.cache_data(ttl=TTL_INFO, show_spinner=False)
+def _fetch_income_stmt(ticker: str) -> Optional[pd.DataFrame]:
+    """Return the quarterly income statement for a ticker (cached)."""
+    return _to_standard_frame(getattr(_ticker(ticker), "quarterly_income_stmt", None))
+
+
+@st.cache_data(ttl=TTL_HISTORY, show_spinner=False)
+def _fetch_recent_history(ticker: str) -> Optional[pd.DataFrame]:
+    """Return the last month of daily history for a ticker (cached)."""
+    return _to_standard_frame(_ticker(ticker).history(period="1mo"))
+
+
+def fetch_stock_frames(
+    symbols: list[str],
+    start_date: date,
+    end_date: date,
+) -> dict[str, pd.DataFrame]:
+    """
+    Fetch historical data for several tickers with a single yf.download call.
+
     Args:
-        ticker_symbol: Stock or ETF ticker symbol
+        symbols: Upper-cased, de-duplicated ticker symbols
         start_date: Start date for data retrieval
         end_date: End date for data retrieval
-    
+
     Returns:
-        DataFrame with stock data or None if error occurs
+        Mapping of symbol to its OHLCV DataFrame; symbols without data are omitted
     """
+    if not symbols:
+        return {}
     try:
-        data = yf.download(ticker_symbol, start=start_date, end=end_date, progress=False)
-        if data.empty:
-            st.error(f"No data found for ticker '{ticker_symbol}'. It might be an invalid ticker or delisted.")
-            return None
-
-        if pd.api.types.is_datetime64_any_dtype(data.index):
-            data.index = data.index.tz_localize(None)
-        if isinstance(data.columns, pd.MultiIndex):
-            data = data.droplevel(1, axis=1)
-        return data
+        raw = _download_stock_batch(tuple(symbols), start_date, end_date)
+    except pc.IncompleteDownloadError as exc:
+        # Served uncached, so the failed symbols are retried on the next rerun
+        raw = _naive_index(exc.data)
     except Exception as e:
-        st.error(f"An error occurred while fetching data for {ticker_symbol}: {e}")
-        return None
-
+        st.error(f"An error occurred while fetching data for {', '.join(symbols)}: {e}")
+        return {}
+    if raw is None or raw.empty:
+        return {}
 
-def get_multiple_stock_data(
-    tickers: list[str],
-    start_date: date,
-    end_date: date,
-) -> dict[str, pd.DataFrame]:
-    """Fetch historical data for multiple tickers (max configured)."""
     datasets: dict[str, pd.DataFrame] = {}
-    seen: set[str] = set()
-    for ticker in tickers:
-        symbol = ticker.upper().strip()
-        if not symbol or symbol in seen:
-            continue
-        seen.add(symbol)
-        if len(datasets) >= MAX_BENCHMARKS:
-            break
-        data = get_stock_data(symbol, start_date, end_date)
-        if data is not None and not data.empty:
+    for symbol in symbols:
+        if isinstance(raw.columns, pd.MultiIndex):
+            if symbol not in raw.columns.get_level_values(0):
+                continue
+            data = raw[symbol]
+        else:  # flat columns: a single-ticker download
+            data = raw
+        data = data.dropna(how="all")
+        if not data.empty:
             datasets[symbol] = data
     return datasets
 
 
+def _unique_symbols(tickers: list[str]) -> list[str]:
+    """Return upper-cased, non-empty ticker symbols in input order without duplicates."""
+    symbols = (ticker.upper().strip() for ticker in tickers)
+    return list(dict.fromkeys(symbol for symbol in symbols if symbol))
+
+
 def plot_normalized_data(
-    data: pd.DataFrame,
-    benchmark_data: dict[str, pd.DataFrame],
+    primary_close: pd.Series,
+    benchmark_closes: dict[str, pd.Series],
     primary_ticker: str,
 ) -> go.Figure:
     """
     Create an interactive Plotly chart showing normalized performance.
 
-    Normalizes all series to start at 100 for fair performance comparison.
+    Takes close series already cleaned by _closing_price_series and normalizes
+    each to start at 100 for fair performance comparison.
     """
     fig = go.Figure()
 
-    primary_close = _closing_price_series(data)
-    primary_normalized = _normalize_series(primary_close)
+    primary_points = _chart_points(primary_close)
+    benchmark_points = {
+        ticker: _chart_points(close) for ticker, close in benchmark_closes.items() if not close.empty
+    }
+    # Browser layout cost scales with the points across all traces, not the longest one
+    total_points = primary_points[0].size + sum(x.size for x, _ in benchmark_points.values())
+    trace_cls = go.Scattergl if total_points > WEBGL_MIN_POINTS else go.Scatter
 
     fig.add_trace(
-        go.Scatter(
-            x=primary_normalized.index,
-            y=primary_normalized,
+        trace_cls(
+            x=primary_points[0],
+            y=primary_points[1],
             mode="lines",
             name=primary_ticker,
         )
     )
 
-    for benchmark_ticker, benchmark_df in benchmark_data.items():
-        benchmark_close = _closing_price_series(benchmark_df)
-        if benchmark_close.empty:
-            continue
-        benchmark_normalized = _normalize_series(benchmark_close)
+    for benchmark_ticker, (x, y) in benchmark_points.items():
         fig.add_trace(
-            go.Scatter(
-                x=benchmark_normalized.index,
-                y=benchmark_normalized,
+            trace_cls(
+                x=x,
+                y=y,
                 mode="lines",
                 name=f"{benchmark_ticker} (Benchmark)",
                 line=dict(dash="dot"),
             )
         )
 
-    benchmark_label = ", ".join(benchmark_data.keys())
+    benchmark_label = ", ".join(benchmark_closes.keys())
     title = f"Performance: {primary_ticker} vs. {benchmark_label}" if benchmark_label else f"{primary_ticker} Performance"
     fig.update_layout(
         title=title,
@@ -145,47 +219,103 @@ def _closing_price_series(data: pd.DataFrame) -> pd.Series:
         series = data.iloc[:, 0]
     else:
         series = pd.Series(dtype=float)
-    series = series.sort_index().dropna()
+    # Downloads arrive sorted and mostly complete; skip the copies when there is nothing to fix
+    if not series.index.is_monotonic_increasing:
+        series = series.sort_index()
+    if series.hasnans:
+        series = series.dropna()
     if isinstance(series.index, pd.DatetimeIndex) and series.index.tz is not None:
         series.index = series.index.tz_localize(None)
     return series
 
 
-def _normalize_series(series: pd.Series) -> pd.Series:
-    """Normalize price series to start at 100."""
-    if series.empty:
-        return series
-    base_value = series.iloc[0]
-    if base_value == 0:
-        return series
-    return (series / base_value) * 100
+def _chart_points(close: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Return (dates, normalized values) arrays for one trace, downsampled past MAX_TRACE_POINTS."""
+    # Plotly serialises ndarrays directly; Series would be iterated element by element
+    x = close.index.to_numpy()
+    y = _normalize_series(close)
+    if y.size > MAX_TRACE_POINTS:
+        keep = _lttb_indices(y, MAX_TRACE_POINTS)
+        x, y = x[keep], y[keep]
+    return x, y
 
 
-def fetch_extended_ticker_data(
-    ticker: str,
-    start_date: date,
-    end_date: date,
-) -> dict[str, Optional[pd.DataFrame]]:
-    """Fetch supplemental datasets and metadata for a ticker."""
-    ticker_obj = yf.Ticker(ticker)
-    info = getattr(ticker_obj, "info", {}) or {}
-    raw_targets = getattr(ticker_obj, "analyst_price_targets", None)
-    price_targets = _to_standard_frame(raw_targets) if raw_targets is not None else None
-    calendar = _to_standard_frame(getattr(ticker_obj, "calendar", None))
-    income_stmt = _to_standard_frame(getattr(ticker_obj, "quarterly_income_stmt", None))
-    history_1mo = _to_standard_frame(ticker_obj.history(period="1mo"))
-    option_chain = _fetch_option_chain(ticker_obj)
-    benchmark_series = _fetch_benchmark_close_series(start_date, end_date)
-
-    return {
-        "info": info,
-        "price_targets": price_targets,
-        "calendar": calendar,
-        "income_stmt": income_stmt,
-        "history": history_1mo,
-        "option_chain": option_chain,
-        "benchmark": benchmark_series,
+def _lttb_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Pick n_out positions that preserve a line's shape (Largest-Triangle-Three-Buckets).
+
+    The first and last points are always kept; every bucket in between keeps the point
+    forming the largest triangle with the previous pick and the next bucket's average.
+    Bars are treated as evenly spaced, which holds closely enough for daily data.
+    """
+    n = values.size
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    y = values.astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)  # n_out - 2 interior buckets
+    csum = np.concatenate(([0.0], np.cumsum(y)))
+    bucket_y = (csum[edges[1:]] - csum[edges[:-1]]) / np.diff(edges)
+    bucket_x = (edges[:-1] + edges[1:] - 1) / 2.0
+    # Third vertex for bucket i is the average of bucket i + 1 (the last point for the final bucket)
+    next_x = np.append(bucket_x[1:], n - 1)
+    next_y = np.append(bucket_y[1:], y[-1])
+
+    picked = np.empty(n_out, dtype=np.intp)
+    picked[0], picked[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        candidates = np.arange(lo, hi)
+        area = np.abs(
+            (prev - next_x[i]) * (y[lo:hi] - y[prev]) - (prev - candidates) * (next_y[i] - y[prev])
+        )
+        prev = lo + int(area.argmax())
+        picked[i + 1] = prev
+    return picked
+
+
+def _normalize_series(series: pd.Series) -> np.ndarray:
+    """Normalize price series to start at 100, returned as a float32 array for plotting."""
+    values = series.to_numpy(dtype=np.float64)
+    if values.size == 0 or values[0] == 0:
+        return values.astype(np.float32)
+    # float32 halves the base64 payload sent to Plotly.js and is ample for a rebased chart
+    return np.multiply(values, 100.0 / values[0], dtype=np.float32)
+
+
+def fetch_extended_ticker_data(ticker: str) -> dict[str, Optional[pd.DataFrame]]:
+    """Fetch supplemental datasets and metadata for a ticker concurrently."""
+    fetchers = {
+        "info": get_ticker_info,
+        "price_targets": _fetch_price_targets,
+        "calendar": _fetch_calendar,
+        "income_stmt": _fetch_income_stmt,
+        "history": _fetch_recent_history,
+        "option_chain": _fetch_option_chain,
     }
+    # Each dataset is an independent Yahoo request; resolve the shared Ticker first so
+    # the workers do not race to create it
+    _ticker(ticker)
+    with _script_thread_pool(min(EXTENDED_FETCH_WORKERS, len(fetchers))) as executor:
+        futures = {key: executor.submit(fetch, ticker) for key, fetch in fetchers.items()}
+
+    extended_data = {key: _result_or_none(future) for key, future in futures.items()}
+    extended_data["info"] = extended_data["info"] or {}
+    return extended_data
+
+
+def _script_thread_pool(max_workers: int) -> ThreadPoolExecutor:
+    """Return a thread pool whose workers carry the current script run context (for st.cache_*)."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ThreadPoolExecutor(max_workers=max_workers, initializer=add_script_run_ctx, initargs=(None, ctx))
+
+
+def _result_or_none(future: Future) -> Optional[object]:
+    """Return a future's result, or None if the fetch raised."""
+    try:
+        return future.result()
+    except Exception:  # pragma: no cover - yfinance network issues
+        return None
 
 
 def _to_standard_frame(data: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
@@ -197,16 +327,20 @@ def _to_standard_frame(data: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
     if isinstance(data, pd.Series):
         return data.to_frame().T if not data.empty else None
     if isinstance(data, pd.DataFrame):
-        df = data.copy()
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
+        if not isinstance(data.columns, pd.MultiIndex):
+            return data
+        # Only the column labels change, so a shallow copy leaves the values shared
+        df = data.copy(deep=False)
+        df.columns = df.columns.get_level_values(0)
         return df
     return None
 
 
 
-def _fetch_option_chain(ticker_obj: yf.Ticker) -> Optional[pd.DataFrame]:
-    """Return option chain dataframe for the nearest expiry."""
+@st.cache_data(ttl=TTL_INFO, show_spinner=False)
+def _fetch_option_chain(ticker: str) -> Optional[pd.DataFrame]:
+    """Return option chain dataframe for the nearest expiry (cached)."""
+    ticker_obj = _ticker(ticker)
     try:
         expiries = getattr(ticker_obj, "options", [])
         if not expiries:
@@ -217,14 +351,6 @@ def _fetch_option_chain(ticker_obj: yf.Ticker) -> Optional[pd.DataFrame]:
         return None
 
 
-def _fetch_benchmark_close_series(start_date: date, end_date: date) -> pd.Series:
-    """Fetch SPY close prices for beta calculation."""
-    spy_data = get_stock_data(DEFAULT_BENCHMARK, start_date, end_date)
-    if spy_data is None or spy_data.empty:
-        return pd.Series(dtype=float)
-    return _closing_price_series(spy_data)
-
-
 def compute_price_statistics(
     close_series: pd.Series,
     benchmark_series: pd.Series,
@@ -271,18 +397,25 @@ def compute_price_statistics(
 
 def _compute_beta(close_series: pd.Series, benchmark_series: pd.Series) -> Optional[float]:
     """Compute beta of the asset versus benchmark."""
-    returns = close_series.pct_change().dropna()
-    benchmark_returns = benchmark_series.reindex(returns.index).pct_change().dropna()
-    if returns.empty or benchmark_returns.empty:
+    common = close_series.index.intersection(benchmark_series.index)
+    asset = close_series.reindex(common).to_numpy(dtype=np.float64)
+    bench = benchmark_series.reindex(common).to_numpy(dtype=np.float64)
+    if asset.size < 2:
         return None
-    aligned = pd.concat([returns, benchmark_returns], axis=1, join="inner").dropna()
-    if aligned.empty:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        asset_returns = np.diff(asset) / asset[:-1]
+        bench_returns = np.diff(bench) / bench[:-1]
+    valid = np.isfinite(asset_returns) & np.isfinite(bench_returns)
+    asset_returns = asset_returns[valid]
+    bench_returns = bench_returns[valid]
+    if bench_returns.size == 0:
         return None
-    cov = np.cov(aligned.iloc[:, 0], aligned.iloc[:, 1])[0, 1]
-    var = np.var(aligned.iloc[:, 1])
+    # Covariance and variance share the same (population) normalisation, so it cancels
+    bench_returns -= bench_returns.mean()
+    var = bench_returns @ bench_returns
     if var == 0:
         return None
-    return float(cov / var)
+    return float((asset_returns - asset_returns.mean()) @ bench_returns / var)
 
 
 def _summarize_price_targets(
@@ -297,9 +430,9 @@ def _summarize_price_targets(
     if isinstance(price_targets, pd.DataFrame):
         if price_targets.empty:
             return None, "N/A", None
-        first_row = price_targets.iloc[0]
-        if first_row is not None:
-            mean_target = first_row.get("targetMean") or first_row.get("mean")
+        # One row-to-dict conversion; dict lookups skip pandas' label indexing path
+        first_row = price_targets.iloc[0].to_dict()
+        mean_target = first_row.get("targetMean") or first_row.get("mean")
     elif isinstance(price_targets, dict):
         if not price_targets:
             return None, "N/A", None
@@ -333,7 +466,7 @@ def render_search_parameters() -> tuple[str, list[str], date, date]:
     ticker_col1, ticker_col2, col1, col2 = st.columns(4)
 
     with ticker_col1:
-        primary_ticker = st.text_input("Enter a Stock or ETF Ticker", DEFAULT_TICKER).upper()
+        primary_ticker = st.text_input("Enter a Stock or ETF Ticker", DEFAULT_TICKER).strip().upper()
     with ticker_col2:
         benchmark_ticker_inputs = st.multiselect(
             "Select Benchmark Tickers (Optional)",
@@ -352,20 +485,18 @@ def render_search_parameters() -> tuple[str, list[str], date, date]:
     return primary_ticker, benchmark_ticker_inputs, start_date, end_date
 
 
-def render_stock_info(ticker: str) -> None:
-    """Render company information for the given ticker."""
-    ticker_info = yf.Ticker(ticker)
-
-    st.header(f"{ticker_info.info.get('longName', ticker)} ({ticker})")
+def render_stock_info(ticker: str, info: dict) -> None:
+    """Render company information from a ticker's info dict."""
+    st.header(f"{info.get('longName', ticker)} ({ticker})")
 
     sector, industry = st.columns([1, 1])
     with sector:
-        st.info(f"**Sector:** {ticker_info.info.get('sector', 'N/A')}")
+        st.info(f"**Sector:** {info.get('sector', 'N/A')}")
     with industry:
-        st.info(f"**Industry:** {ticker_info.info.get('industry', 'N/A')}")
+        st.info(f"**Industry:** {info.get('industry', 'N/A')}")
 
     with st.expander("Business Summary"):
-        st.write(ticker_info.info.get('longBusinessSummary', 'No description available.'))
+        st.write(info.get('longBusinessSummary', 'No description available.'))
 
 
 def render_extended_sections(
@@ -462,28 +593,44 @@ def render_chart(
     end_date: date,
 ) -> None:
     """Render normalized performance chart."""
-    stock_data = get_stock_data(primary_ticker, start_date, end_date)
+    # Primary, benchmarks and the beta benchmark (SPY) share one batched download
+    benchmark_symbols = _unique_symbols(benchmark_ticker_inputs)[:MAX_BENCHMARKS]
+    datasets = fetch_stock_frames(
+        _unique_symbols([primary_ticker, *benchmark_symbols, DEFAULT_BENCHMARK]), start_date, end_date
+    )
+    stock_data = datasets.get(primary_ticker)
 
     if stock_data is None or stock_data.empty:
+        st.error(f"No data found for ticker '{primary_ticker}'. It might be an invalid ticker or delisted.")
         return
 
-    render_stock_info(primary_ticker)
+    # The supplemental datasets (info, targets, ...) are only worth fetching for a valid
+    # ticker; they load in the background while the chart renders. The header reads the
+    # same info dict, so its slot is reserved now and filled once the fetch completes
+    with _script_thread_pool(1) as executor:
+        extended_future = executor.submit(fetch_extended_ticker_data, primary_ticker)
+        header = st.container()
+
+        # Extract each close series once; the chart, beta and statistics all reuse them
+        closes = {symbol: _closing_price_series(data) for symbol, data in datasets.items()}
+        primary_close = closes[primary_ticker]
+        benchmark_closes = {symbol: closes[symbol] for symbol in benchmark_symbols if symbol in closes}
 
-    extended_data = fetch_extended_ticker_data(primary_ticker, start_date, end_date)
-    benchmark_data: dict[str, pd.DataFrame] = {}
-    if benchmark_ticker_inputs:
-        benchmark_data = get_multiple_stock_data(benchmark_ticker_inputs, start_date, end_date)
+        # Render normalized performance chart
+        fig = plot_normalized_data(primary_close, benchmark_closes, primary_ticker)
+        st.plotly_chart(fig, use_container_width=True)
+
+        extended_data = extended_future.result()
+
+    with header:
+        render_stock_info(primary_ticker, extended_data["info"])
 
     stats = compute_price_statistics(
-        _closing_price_series(stock_data),
-        extended_data.get("benchmark", pd.Series(dtype=float)),
+        primary_close,
+        closes.get(DEFAULT_BENCHMARK, pd.Series(dtype=float)),
         extended_data.get("price_targets"),
     )
-    market_cap = extended_data.get("info", {}).get("marketCap")
-
-    # Render normalized performance chart
-    fig = plot_normalized_data(stock_data, benchmark_data, primary_ticker)
-    st.plotly_chart(fig, use_container_width=True)
+    market_cap = extended_data["info"].get("marketCap")
 
     render_extended_sections(primary_ticker, market_cap, stats, extended_data)
 
@@ -12,11 +12,14 @@ from __future__ import annotations
 
 # ── Stdlib
 import math
-from typing import Dict, Tuple
+from datetime import date
+from typing import Dict, List, Sequence, Tuple
 
 # ── Third-party
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import streamlit as st
 
 # ── Local
@@ -37,18 +40,81 @@ DEFAULT_MC_PATHS = 500
 MIN_MC_HORIZON = 21
 MAX_MC_HORIZON = 756
 DEFAULT_MC_HORIZON = 252
+MC_SAMPLING_MODES = ["Pseudo-random", "Antithetic"]
+MC_CACHE_ENTRIES = 8  # Each simulation is up to MAX_MC_HORIZON x MAX_MC_PATHS float32 (~15 MB)
+TAB_CACHE_ENTRIES = 32
 # ╰─────────────────────────────────────────────────────────────────╯
 
 
 # ╭──────────────────────── Helpers and caching ──────────────────────╮
+@st.cache_data(show_spinner=False)
+def business_day_index(anchor: date, periods: int, backward: bool = False) -> pd.DatetimeIndex:
+    """Weekday index of `periods` dates starting at anchor (or ending at it when backward).
+
+    Matches pd.bdate_range(start=anchor) / pd.bdate_range(end=anchor) via a single
+    vectorised np.busday_offset call.
+    """
+    if backward:
+        offsets = np.arange(1 - periods, 1)
+        days = np.busday_offset(np.datetime64(anchor, "D"), offsets, roll="backward")
+    else:
+        days = np.busday_offset(np.datetime64(anchor, "D"), np.arange(periods), roll="forward")
+    return pd.DatetimeIndex(days.astype("datetime64[ns]"))
+
+
+def gbm_paths(
+    seed: int,
+    n: int,
+    paths: int,
+    mu: float,
+    sigma: float,
+    s0: float,
+    antithetic: bool = False,
+    dtype: type = np.float64,
+) -> np.ndarray:
+    """Simulate an (n x paths) matrix of daily GBM prices in a single in-place buffer.
+
+    With antithetic=True only half the shocks are drawn; the other half are their
+    negatives, which cancels odd moments and tightens terminal estimates per path.
+    dtype may be np.float32 to halve memory and bandwidth for large path counts.
+    """
+    dt = 1 / 252
+    rng = np.random.default_rng(seed)
+    out = np.empty((n, paths), dtype=dtype)
+    if antithetic:
+        half = (paths + 1) // 2
+        draws = rng.standard_normal((n, half), dtype=dtype)  # column slices of out are not contiguous
+        out[:, :half] = draws
+        np.negative(draws[:, : paths - half], out=out[:, half:])
+    else:
+        rng.standard_normal(dtype=dtype, out=out)
+    out *= sigma * math.sqrt(dt)
+    out += (mu - 0.5 * sigma**2) * dt
+    np.cumsum(out, axis=0, out=out)
+    out += math.log(s0)
+    np.exp(out, out=out)
+    return out
+
+
+@st.cache_data(max_entries=MC_CACHE_ENTRIES, show_spinner=False)
+def simulate_gbm(
+    seed: int,
+    n: int,
+    paths: int,
+    mu: float,
+    sigma: float,
+    s0: float,
+    antithetic: bool = False,
+) -> np.ndarray:
+    """Cached float32 gbm_paths, so reruns that leave the MC inputs alone skip the simulation."""
+    return gbm_paths(seed, n, paths, mu, sigma, s0, antithetic=antithetic, dtype=np.float32)
+
+
 @st.cache_data
 def make_synth_price(seed: int, n: int = DEFAULT_DAYS, mu: float = DEFAULT_MU, sigma: float = DEFAULT_SIGMA, s0: float = DEFAULT_S0) -> pd.Series:
     """Geometric Brownian Motion synthetic price."""
-    rng = np.random.default_rng(seed)
-    dt = 1/252
-    shocks = rng.normal((mu - 0.5 * sigma**2) * dt, sigma * math.sqrt(dt), size=n)
-    log_price = np.log(s0) + np.cumsum(shocks)
-    return pd.Series(np.exp(log_price), index=pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n))
+    prices = gbm_paths(seed, n, 1, mu, sigma, s0)[:, 0]
+    return pd.Series(prices, index=business_day_index(date.today(), n, backward=True))
 
 @st.cache_data
 def make_synth_pair(seed: int, n: int = DEFAULT_DAYS) -> Tuple[pd.Series, pd.Series]:
@@ -58,26 +124,209 @@ def make_synth_pair(seed: int, n: int = DEFAULT_DAYS) -> Tuple[pd.Series, pd.Ser
     return a, b
 
 
-def zscore(series: pd.Series, window: int = 60) -> pd.Series:
-    """Calculate z-score of a series using rolling window."""
-    return (series - series.rolling(window).mean()) / series.rolling(window).std(ddof=0)
+def rolling_means(values: np.ndarray, windows: Sequence[int]) -> List[np.ndarray]:
+    """Trailing rolling means for several windows from one cumulative sum (rolling(w).mean() each).
+
+    Each window is a difference of two prefix sums, so the cost is O(n) however wide it
+    is. Windows that contain a NaN stay NaN, as in pandas.
+    """
+    missing = np.isnan(values)
+    has_missing = bool(missing.any())
+    prefix = np.zeros(values.size + 1)
+    np.cumsum(np.where(missing, 0.0, values) if has_missing else values, out=prefix[1:])
+    if has_missing:
+        missing_prefix = np.zeros(values.size + 1, dtype=np.intp)
+        np.cumsum(missing, out=missing_prefix[1:])
+
+    means = []
+    for window in windows:
+        out = np.full(values.shape, np.nan)
+        if 0 < window <= values.size:
+            out[window - 1:] = (prefix[window:] - prefix[:-window]) / window
+            if has_missing:
+                out[window - 1:][missing_prefix[window:] > missing_prefix[:-window]] = np.nan
+        means.append(out)
+    return means
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing rolling mean of a float array; NaN until the window fills (rolling(window).mean())."""
+    return rolling_means(values, (window,))[0]
+
+
+def _rolling_var(values: np.ndarray, mean: np.ndarray, window: int) -> np.ndarray:
+    """Population rolling variance E[x²] - E[x]², clipped at 0 against rounding."""
+    var = rolling_mean(values * values, window)
+    var -= mean * mean
+    return np.maximum(var, 0.0, out=var, where=~np.isnan(var))
+
+
+def rolling_mean_std(values: np.ndarray, window: int, ddof: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Trailing rolling mean and standard deviation in O(n) from prefix sums of x and x²."""
+    mean = rolling_mean(values, window)
+    var = _rolling_var(values, mean, window)
+    if ddof:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var *= window / (window - ddof)
+    return mean, np.sqrt(var, out=var)
+
+
+def rolling_pearson(x: np.ndarray, y: np.ndarray, window: int) -> np.ndarray:
+    """Trailing rolling Pearson correlation in O(n) from rolling means of x, y, xy, x² and y²."""
+    mean_x = rolling_mean(x, window)
+    mean_y = rolling_mean(y, window)
+    cov = rolling_mean(x * y, window) - mean_x * mean_y
+    var_x = _rolling_var(x, mean_x, window)
+    var_y = _rolling_var(y, mean_y, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return cov / np.sqrt(var_x * var_y)
+
+
+@st.cache_data(show_spinner=False)
+def build_pair_export(seed: int, n: int) -> Tuple[pd.DataFrame, bytes]:
+    """Return the A/B demo table with log returns and its CSV bytes (both cached per seed/length)."""
+    a, b = make_synth_pair(seed, n=n)
+    df_all = pd.DataFrame({
+        "A": a, "B": b,
+        "A_ret": np.log(a).diff(),
+        "B_ret": np.log(b).diff(),
+    }).dropna()
+    return df_all, _to_csv_bytes(df_all)
 
 
-def perf_stats(returns: pd.Series) -> Dict[str, float]:
+def _to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """Encode a date-indexed frame as CSV bytes with Arrow's C++ writer."""
+    columns = {"Date": df.index.to_numpy().astype("datetime64[D]")}
+    columns.update({name: df[name].to_numpy() for name in df.columns})
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    pa_csv.write_csv(table, sink)
+    return sink.getvalue().to_pybytes()
+
+
+def zscore(series: pd.Series, window: int = 60) -> pd.Series:
+    """Calculate z-score of a series using rolling window."""
+    values = series.to_numpy(dtype=np.float64)
+    mean, std = rolling_mean_std(values, window)
+    return pd.Series((values - mean) / std, index=series.index)
+
+
+def logspread_zscore(a: np.ndarray, b: np.ndarray, window: int) -> np.ndarray:
+    """Rolling z-score of the log spread log(a) - log(b), computed in a single buffer."""
+    z = np.divide(a, b)
+    np.log(z, out=z)
+    mean, std = rolling_mean_std(z, window)
+    z -= mean
+    z /= std
+    return z
+
+
+def lag_signal(signal: np.ndarray) -> np.ndarray:
+    """Apply a signal on the next bar: shift one step and treat missing positions as flat."""
+    lagged = np.zeros_like(signal)
+    lagged[1:] = signal[:-1]
+    return np.nan_to_num(lagged, copy=False, nan=0.0)
+
+
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    """Daily simple returns with a NaN first bar (pct_change() on raw arrays)."""
+    returns = np.empty_like(prices)
+    returns[0] = np.nan
+    np.divide(prices[1:], prices[:-1], out=returns[1:])
+    returns[1:] -= 1.0
+    return returns
+
+
+def log_returns(prices: np.ndarray) -> np.ndarray:
+    """Daily log returns with a flat first bar (np.log(px).diff().fillna(0) on raw arrays)."""
+    returns = np.zeros_like(prices)
+    np.subtract(np.log(prices[1:]), np.log(prices[:-1]), out=returns[1:])
+    return np.nan_to_num(returns, copy=False, nan=0.0)
+
+
+def rv_signal(z: np.ndarray, entry: float, exit_: float) -> np.ndarray:
+    """Toy RV position: short the spread when z >= entry, long when z <= -entry, flat when |z| <= exit.
+
+    Between the exit and entry bands the previous position is held, so one pass of
+    a running-maximum forward fill replaces a per-bar state loop.
+    """
+    decided = np.full(z.shape, np.nan)
+    decided[np.abs(z) <= exit_] = 0.0
+    decided[z >= entry] = -1.0
+    decided[z <= -entry] = 1.0
+    known = ~np.isnan(decided)
+    if not known.any():
+        return np.zeros_like(z, dtype=np.float64)
+    # Index of the most recent decided bar (0 before the first one, which is masked below)
+    last = np.maximum.accumulate(np.where(known, np.arange(z.size), 0))
+    signal = decided[last]
+    signal[: np.argmax(known)] = 0.0
+    return signal
+
+
+def perf_stats(returns: pd.Series | np.ndarray) -> Dict[str, float]:
     """Calculate simple annualized performance statistics."""
-    ret = returns.dropna()
-    if ret.empty:
+    ret = np.asarray(returns, dtype=np.float64)
+    ret = ret[~np.isnan(ret)]
+    if ret.size == 0:
         return {"CAGR": 0, "Vol": 0, "Sharpe": 0, "MaxDD": 0}
-    cagr = (1 + ret).prod() ** (252 / len(ret)) - 1
-    vol = ret.std() * np.sqrt(252)
+    # Work on the log equity curve: growth is a sum (no long product to underflow) and
+    # the drawdown is the gap below its running maximum
+    log_curve = np.cumsum(np.log1p(ret))
+    cagr = math.expm1(log_curve[-1] * 252 / ret.size)
+    vol = ret.std(ddof=1) * np.sqrt(252) if ret.size > 1 else np.nan
     sharpe = cagr / vol if vol != 0 else np.nan
-    curve = (1 + ret).cumprod()
-    peak = curve.cummax()
-    dd = (curve / peak - 1).min()
+    log_curve -= np.maximum.accumulate(log_curve)
+    dd = math.expm1(log_curve.min())
     return {"CAGR": cagr, "Vol": vol, "Sharpe": sharpe, "MaxDD": dd}
 # ╰─────────────────────────────────────────────────────────────────╯
 
 
+# ╭──────────────────────── Tab computations ──────────────────────╮
+@st.cache_data(max_entries=TAB_CACHE_ENTRIES, show_spinner=False)
+def compute_ma_rv(seed: int, n: int, ma_fast: int, ma_slow: int, rv_window: int) -> pd.DataFrame:
+    """Return the A/B pair with moving averages, spread z-score and rolling correlation."""
+    a, b = make_synth_pair(seed, n=n)
+    # Work on flat arrays and assemble the frame once, instead of inserting column by column
+    a_vals = a.to_numpy(dtype=np.float64)
+    b_vals = b.to_numpy(dtype=np.float64)
+    ma_fast_vals, ma_slow_vals = rolling_means(a_vals, (ma_fast, ma_slow))
+    return pd.DataFrame(
+        {
+            "A": a_vals,
+            "B": b_vals,
+            "A_ma_fast": ma_fast_vals,
+            "A_ma_slow": ma_slow_vals,
+            "z": logspread_zscore(a_vals, b_vals, rv_window),
+            "roll_corr": rolling_pearson(simple_returns(a_vals), simple_returns(b_vals), rv_window),
+        },
+        index=a.index,
+    )
+
+
+@st.cache_data(max_entries=TAB_CACHE_ENTRIES, show_spinner=False)
+def compute_strategy(seed: int, n: int, mode: str, w1: int, w2: int) -> Tuple[pd.DataFrame, Dict[str, float]]:
+    """Return price, moving averages, strategy returns and equity curve, plus performance stats."""
+    price = make_synth_price(seed + 7, n=n, mu=0.07, sigma=0.22, s0=100)
+    px_vals = price.to_numpy(dtype=np.float64)
+    ma1, ma2 = rolling_means(px_vals, (w1, w2))
+
+    # Signal
+    if mode == "Crossover":
+        sig = np.where(ma1 > ma2, 1.0, np.where(ma1 < ma2, -1.0, 0.0))
+    else:
+        z_ = zscore(price, window=w2).to_numpy()
+        sig = np.clip(-z_, -1, 1)  # fade to mean
+
+    strat = lag_signal(sig) * log_returns(px_vals)
+    dfS = pd.DataFrame(
+        {"px": px_vals, "ma1": ma1, "ma2": ma2, "strat": strat, "equity": np.cumprod(1.0 + strat)},
+        index=price.index,
+    )
+    return dfS, perf_stats(strat)
+# ╰─────────────────────────────────────────────────────────────────╯
+
+
 # ╭────────────────────────── Render sections ──────────────────────╮
 def render_header() -> None:
     """Configure page header and layout."""
@@ -108,7 +357,7 @@ def render_settings() -> tuple[int, str, int]:
 def render_monte_carlo_tab(seed: int, n_days: int) -> None:
     """Render Monte Carlo simulation tab."""
     st.subheader("Monte Carlo (GBM)")
-    c1, c2, c3, c4 = st.columns(4)
+    c1, c2, c3, c4, c5 = st.columns(5)
     with c1:
         mc_paths = st.number_input("Paths", min_value=MIN_MC_PATHS, max_value=MAX_MC_PATHS, value=DEFAULT_MC_PATHS, step=100)
     with c2:
@@ -117,31 +366,41 @@ def render_monte_carlo_tab(seed: int, n_days: int) -> None:
         mc_mu = st.number_input("μ (annualized drift)", value=DEFAULT_MU, step=0.01, format="%.2f")
     with c4:
         mc_sigma = st.number_input("σ (annualized vol)", value=DEFAULT_SIGMA, step=0.01, format="%.2f")
+    with c5:
+        sampling = st.selectbox("Sampling", MC_SAMPLING_MODES, index=0)
 
     base = make_synth_price(seed, n=n_days)
     s0 = float(base.iloc[-1])
 
-    # Simulate GBM paths
-    dt = 1 / 252
-    rng = np.random.default_rng(seed)
-    shocks = rng.normal((mc_mu - 0.5 * mc_sigma**2) * dt, mc_sigma * math.sqrt(dt), size=(mc_horizon, mc_paths))
-    log_paths = np.log(s0) + shocks.cumsum(axis=0)
-    sim = pd.DataFrame(np.exp(log_paths), index=pd.bdate_range(start=pd.Timestamp.today().normalize(), periods=mc_horizon))
+    paths = simulate_gbm(
+        seed,
+        int(mc_horizon),
+        int(mc_paths),
+        float(mc_mu),
+        float(mc_sigma),
+        s0,
+        antithetic=sampling == "Antithetic",
+    )
 
     cL, cR = st.columns([2, 1])
     with cL:
-        st.line_chart(sim.iloc[:, : min(mc_paths, 50)], height=300, use_container_width=True)  # plot first 50 for speed
+        # Only the plotted paths get a DataFrame (and a date index). Striding spreads the
+        # ~50 shown paths across the whole sample (already float32, half the chart payload)
+        sim_index = business_day_index(date.today(), int(mc_horizon))
+        step = max(1, int(mc_paths) // 50)
+        shown = pd.DataFrame(paths[:, ::step][:, :50], index=sim_index)
+        st.line_chart(shown, height=300, use_container_width=True)
     with cR:
-        terminal = sim.iloc[-1]
-        st.metric("Median Terminal Price", f"{terminal.median():.2f}")
-        st.metric("5–95% Interval", f"{terminal.quantile(0.05):.2f} – {terminal.quantile(0.95):.2f}")
+        # One partition of the terminal row yields all three order statistics
+        q05, q50, q95 = np.quantile(paths[-1], [0.05, 0.5, 0.95])
+        st.metric("Median Terminal Price", f"{q50:.2f}")
+        st.metric("5–95% Interval", f"{q05:.2f} – {q95:.2f}")
         st.caption("Plot shows a subset of paths. Export full matrix from the Downloads tab.")
 
 
 def render_ma_rv_tab(seed: int, n_days: int) -> None:
     """Render Moving Average & Relative Value tab."""
     st.subheader("Moving Average & Relative Value")
-    a, b = make_synth_pair(seed, n=n_days)
 
     cA, cB, cWin = st.columns(3)
     with cA:
@@ -151,12 +410,8 @@ def render_ma_rv_tab(seed: int, n_days: int) -> None:
     with cWin:
         rv_window = st.number_input("RV z-score window", min_value=20, max_value=240, value=60, step=10)
 
-    df = pd.DataFrame({"A": a, "B": b}).dropna()
-    df["A_ma_fast"] = df["A"].rolling(ma_fast).mean()
-    df["A_ma_slow"] = df["A"].rolling(ma_slow).mean()
-    df["spread"] = np.log(df["A"]) - np.log(df["B"])
-    df["z"] = zscore(df["spread"], window=rv_window)
-    df["roll_corr"] = df["A"].pct_change().rolling(rv_window).corr(df["B"].pct_change())
+    df = compute_ma_rv(seed, n_days, int(ma_fast), int(ma_slow), int(rv_window))
+    a_vals = df["A"].to_numpy(dtype=np.float64)
 
     g1, g2 = st.columns(2)
     with g1:
@@ -171,15 +426,12 @@ def render_ma_rv_tab(seed: int, n_days: int) -> None:
     with st.expander("Simple RV signal (example)"):
         entry = st.slider("Enter when |z| >=", 0.5, 3.0, 2.0, 0.5)
         exit_ = st.slider("Exit when |z| <=", 0.0, 2.0, 0.5, 0.5)
-        # Toy signal: long A/short B when z<-entry, opposite when z>entry; flat when |z|<=exit
-        sig = pd.Series(0, index=df.index, dtype=float)
-        sig[df["z"] >= entry] = -1.0   # short A, long B
-        sig[df["z"] <= -entry] = +1.0  # long A, short B
-        sig[(df["z"].abs() <= exit_)] = 0.0
-        sig = sig.shift(1).fillna(0)   # enter next day
-        ret_pair = (np.log(df["A"]).diff() - np.log(df["B"]).diff()).fillna(0)
+        # Toy signal: long A/short B when z<-entry, opposite when z>entry; flat when |z|<=exit,
+        # otherwise hold the current position
+        sig = lag_signal(rv_signal(df["z"].to_numpy(), entry, exit_))  # enter next day
+        ret_pair = log_returns(a_vals) - log_returns(df["B"].to_numpy(dtype=np.float64))
         strat_ret = sig * ret_pair
-        st.line_chart((1 + strat_ret).cumprod(), height=220, use_container_width=True)
+        st.line_chart(pd.Series(np.cumprod(1.0 + strat_ret), index=df.index), height=220, use_container_width=True)
         stats = perf_stats(strat_ret)
         s1, s2, s3, s4 = st.columns(4)
         s1.metric("CAGR", f"{stats['CAGR']*100:.2f}%")
@@ -191,7 +443,6 @@ def render_ma_rv_tab(seed: int, n_days: int) -> None:
 def render_strategy_tab(seed: int, n_days: int) -> None:
     """Render Strategy Lab tab."""
     st.subheader("Strategy Lab (Crossover / Mean Reversion)")
-    price = make_synth_price(seed + 7, n=n_days, mu=0.07, sigma=0.22, s0=100)
 
     c1, c2, c3 = st.columns(3)
     with c1:
@@ -201,30 +452,15 @@ def render_strategy_tab(seed: int, n_days: int) -> None:
     with c3:
         w2 = st.number_input("Window 2", min_value=10, max_value=300, value=60, step=10)
 
-    dfS = pd.DataFrame({"px": price})
-    dfS["ma1"] = dfS["px"].rolling(w1).mean()
-    dfS["ma2"] = dfS["px"].rolling(w2).mean()
-
-    # Signal
-    if mode == "Crossover":
-        sig = (dfS["ma1"] > dfS["ma2"]).astype(float) - (dfS["ma1"] < dfS["ma2"]).astype(float)
-    else:
-        z_ = zscore(dfS["px"], window=w2)
-        sig = (-z_).clip(-1, 1)  # fade to mean
-
-    sig = sig.shift(1).fillna(0)
-    ret = np.log(dfS["px"]).diff().fillna(0)
-    strat = (sig * ret).fillna(0)
+    dfS, stats = compute_strategy(seed, n_days, mode, int(w1), int(w2))
 
     # Charts
     cL, cR = st.columns([2, 1])
     with cL:
         st.line_chart(dfS[["px", "ma1", "ma2"]].dropna(), height=280, use_container_width=True)
     with cR:
-        equity = (1 + strat).cumprod()
-        st.line_chart(equity, height=280, use_container_width=True)
+        st.line_chart(dfS["equity"], height=280, use_container_width=True)
 
-    stats = perf_stats(strat)
     s1, s2, s3, s4 = st.columns(4)
     s1.metric("CAGR", f"{stats['CAGR']*100:.2f}%")
     s2.metric("Vol", f"{stats['Vol']*100:.2f}%")
@@ -243,16 +479,10 @@ def render_visuals_tab(seed: int, n_days: int) -> None:
     st.subheader("Data & Exports")
     st.caption("Inspect the generated demo series and export for offline analysis.")
 
-    a, b = make_synth_pair(seed, n=n_days)
-    df_all = pd.DataFrame({
-        "A": a, "B": b,
-        "A_ret": np.log(a).diff(),
-        "B_ret": np.log(b).diff(),
-    }).dropna()
+    df_all, csv = build_pair_export(seed, n_days)
 
     st.dataframe(df_all.tail(250), use_container_width=True, height=300)
 
-    csv = df_all.to_csv(index=True).encode("utf-8")
     st.download_button("Download CSV (A/B demo)", data=csv, file_name="quant_playground_AB.csv", mime="text/csv")
 
     st.markdown("---")
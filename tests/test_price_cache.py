@@ -0,0 +1,156 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.fetchers import price_cache as pc
+
+
+PAST_START = date(2024, 1, 1)
+PAST_END = date(2024, 1, 6)
+
+
+def make_download(tickers, failed=(), group_by="column"):
+    """Build a yf.download-shaped OHLCV frame; failed tickers get all-NaN columns."""
+    index = pd.date_range(PAST_START, periods=3, name="Date")
+    fields = ["Close", "Open"]
+    blocks = {}
+    for ticker in tickers:
+        values = np.full((3, len(fields)), np.nan) if ticker in failed else np.arange(6.0).reshape(3, 2) + 1
+        blocks[ticker] = pd.DataFrame(values, index=index, columns=fields)
+    data = pd.concat(blocks, axis=1, names=["Ticker", "Price"])
+    if group_by == "column":
+        data = data.swaplevel(axis=1).sort_index(axis=1)
+    return data
+
+
+class PriceCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        patcher = patch.object(pc, "CACHE_DIR", Path(self._tmp.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _touch(self, age: float = 0.0) -> Path:
+        path = Path(self._tmp.name) / "entry.parquet"
+        path.write_bytes(b"")
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_is_fresh_missing_file(self):
+        self.assertFalse(pc._is_fresh(Path(self._tmp.name) / "absent.parquet", PAST_END, 60))
+
+    def test_is_fresh_closed_range(self):
+        path = self._touch(age=3600)
+        self.assertTrue(pc._is_fresh(path, PAST_END, max_age=60))
+
+    def test_is_fresh_closed_range_past_retention(self):
+        path = self._touch(age=pc.CACHE_RETENTION + 60)
+        self.assertFalse(pc._is_fresh(path, PAST_END, max_age=60))
+
+    def test_is_fresh_open_range_expires(self):
+        future_end = date.today() + timedelta(days=1)
+        self.assertTrue(pc._is_fresh(self._touch(age=10), future_end, max_age=60))
+        self.assertFalse(pc._is_fresh(self._touch(age=120), future_end, max_age=60))
+
+    def test_is_fresh_range_ending_today_expires(self):
+        self.assertFalse(pc._is_fresh(self._touch(age=120), date.today(), max_age=60))
+
+    def test_field_slices_tickers(self):
+        with patch.object(pc.yf, "download", return_value=make_download(["AAPL", "MSFT"])):
+            close = pc.download_history(["MSFT", "AAPL"], PAST_START, PAST_END, field="Close")
+        self.assertEqual(sorted(close.columns), ["AAPL", "MSFT"])
+        self.assertEqual(close["AAPL"].tolist(), [1.0, 3.0, 5.0])
+
+    def test_field_single_series_named_by_ticker(self):
+        flat = make_download(["AAPL"]).droplevel("Ticker", axis=1)
+        with patch.object(pc.yf, "download", return_value=flat):
+            close = pc.download_history(["AAPL"], PAST_START, PAST_END, field="Close")
+        self.assertEqual(list(close.columns), ["AAPL"])
+
+    def test_complete_result_served_from_disk(self):
+        with patch.object(pc.yf, "download", return_value=make_download(["AAPL", "MSFT"])) as download:
+            pc.download_history(["AAPL", "MSFT"], PAST_START, PAST_END, field="Close")
+            cached = pc.download_history(["AAPL", "MSFT"], PAST_START, PAST_END, field="Close")
+        self.assertEqual(download.call_count, 1)
+        self.assertFalse(cached.isna().any().any())
+
+    def test_partial_result_is_not_cached(self):
+        responses = [
+            make_download(["AAPL", "MSFT"], failed=["AAPL"]),
+            make_download(["AAPL", "MSFT"]),
+        ]
+        with patch.object(pc.yf, "download", side_effect=responses) as download:
+            first = pc.download_history(["AAPL", "MSFT"], PAST_START, PAST_END, field="Close")
+            second = pc.download_history(["AAPL", "MSFT"], PAST_START, PAST_END, field="Close")
+        self.assertTrue(first["AAPL"].isna().all())
+        self.assertEqual(download.call_count, 2)
+        self.assertFalse(second["AAPL"].isna().any())
+
+    def test_partial_grouped_by_ticker_is_not_cached(self):
+        responses = [
+            make_download(["AAPL", "SPY"], failed=["SPY"], group_by="ticker"),
+            make_download(["AAPL", "SPY"], group_by="ticker"),
+        ]
+        with patch.object(pc.yf, "download", side_effect=responses) as download:
+            pc.download_history(["AAPL", "SPY"], PAST_START, PAST_END, group_by="ticker")
+            second = pc.download_history(["AAPL", "SPY"], PAST_START, PAST_END, group_by="ticker")
+        self.assertEqual(download.call_count, 2)
+        self.assertFalse(second["SPY"].isna().all().all())
+
+    def test_strict_raises_on_partial_result(self):
+        partial = make_download(["AAPL", "MSFT"], failed=["MSFT"])
+        with patch.object(pc.yf, "download", return_value=partial):
+            with self.assertRaises(pc.IncompleteDownloadError) as ctx:
+                pc.download_history(["AAPL", "MSFT"], PAST_START, PAST_END, field="Close", strict=True)
+        self.assertEqual(ctx.exception.missing, ["MSFT"])
+        self.assertFalse(ctx.exception.data["AAPL"].isna().any())
+
+    def test_strict_raises_on_empty_result(self):
+        with patch.object(pc.yf, "download", return_value=pd.DataFrame()):
+            with self.assertRaises(pc.IncompleteDownloadError) as ctx:
+                pc.download_history(["AAPL"], PAST_START, PAST_END, strict=True)
+        self.assertEqual(ctx.exception.missing, ["AAPL"])
+
+    def test_write_prunes_expired_files(self):
+        stale = self._touch(age=pc.CACHE_RETENTION + 60)
+        recent = Path(self._tmp.name) / "recent.parquet"
+        recent.write_bytes(b"")
+        with patch.object(pc.yf, "download", return_value=make_download(["AAPL"])):
+            pc.download_history(["AAPL"], PAST_START, PAST_END, field="Close")
+        self.assertFalse(stale.exists())
+        self.assertTrue(recent.exists())
+        self.assertEqual(len(list(Path(self._tmp.name).glob("*.parquet"))), 2)
+
+    def test_clear_cache_drops_open_ranges_only(self):
+        open_end = date.today() + timedelta(days=1)
+        with patch.object(pc.yf, "download", return_value=make_download(["AAPL"])) as download:
+            pc.download_history(["AAPL"], PAST_START, PAST_END, field="Close")
+            pc.download_history(["AAPL"], PAST_START, open_end, field="Close")
+            pc.clear_cache()
+            pc.download_history(["AAPL"], PAST_START, PAST_END, field="Close")
+            pc.download_history(["AAPL"], PAST_START, open_end, field="Close")
+        self.assertEqual(download.call_count, 3)
+
+    def test_missing_symbols(self):
+        self.assertEqual(pc._missing_symbols(make_download(["AAPL", "MSFT"], failed=["MSFT"]), ["AAPL", "MSFT"]), ["MSFT"])
+        self.assertEqual(pc._missing_symbols(make_download(["AAPL"]), ["AAPL", "IBM"]), ["IBM"])
+        flat = make_download(["AAPL"]).droplevel("Ticker", axis=1)
+        self.assertEqual(pc._missing_symbols(flat, ["AAPL"]), [])
+        self.assertEqual(pc._missing_symbols(flat * np.nan, ["AAPL"]), ["AAPL"])
+
+
+if __name__ == "__main__":
+    unittest.main()
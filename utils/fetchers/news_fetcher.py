@@ -20,7 +20,11 @@ API_KEY = os.getenv("NEWSAPI_KEY")
 if not API_KEY:
     raise RuntimeError("Missing NEWSAPI_KEY in .env")
 
-newsapi = NewsApiClient(API_KEY)
+# One pooled HTTP session for every NewsAPI call so TCP+TLS stays warm across reruns
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "CorpBonds/1.0", "X-Api-Key": API_KEY})
+
+newsapi = NewsApiClient(API_KEY, session=_SESSION)
 
 
 # ╭─────────────────────────── Constants ───────────────────────────╮
@@ -124,7 +128,6 @@ def fetch_headlines(
         List of normalized article dictionaries
     """
     params_local: Dict[str, Any] = {
-        "apiKey": API_KEY,
         "language": DEFAULT_LANGUAGE,
         "pageSize": page_size,
     }
@@ -132,7 +135,7 @@ def fetch_headlines(
     if joined:
         params_local["sources"] = joined
 
-    resp = requests.get(URL, params=params_local, timeout=REQUEST_TIMEOUT)
+    resp = _SESSION.get(URL, params=params_local, timeout=REQUEST_TIMEOUT)
     resp.raise_for_status()
     data = resp.json()
     return _normalize_articles(data.get("articles", []))
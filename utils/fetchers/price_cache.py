@@ -0,0 +1,170 @@
+# utils/fetchers/price_cache.py ─────────────────────────────────────────────────────────
+"""Persistent on-disk cache for historical yfinance price downloads."""
+
+from __future__ import annotations
+
+# ── Stdlib
+import hashlib
+import os
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Sequence
+
+# ── Third-party
+import pandas as pd
+import yfinance as yf
+
+
+# ╭─────────────────────────── Constants ───────────────────────────╮
+CACHE_DIR = Path(os.getenv("CORPBONDS_CACHE_DIR", ".cache/yf"))
+
+# Ranges ending today or later can still receive new bars; earlier ranges are final
+TTL_OPEN_RANGE = 60 * 5
+# Every file (closed ranges included) is dropped after this, so the directory stays bounded
+CACHE_RETENTION = 60 * 60 * 24
+# ╰─────────────────────────────────────────────────────────────────╯
+
+
+class IncompleteDownloadError(RuntimeError):
+    """Raised in strict mode when a download lacks some requested symbols; carries the partial frame."""
+
+    def __init__(self, data: pd.DataFrame, missing: Sequence[str]) -> None:
+        super().__init__(f"No price data returned for {', '.join(missing)}")
+        self.data = data
+        self.missing = list(missing)
+
+
+# ╭─────────────────────────── Helper Functions ───────────────────────────╮
+def _cache_path(tickers: Sequence[str], start: date, end: date, options: dict[str, Any]) -> Path:
+    """Return the Parquet file path for a download request (prefixed by its end date)."""
+    key = f"{','.join(tickers)}:{start.isoformat()}:{end.isoformat()}:{sorted(options.items())}"
+    return CACHE_DIR / f"{end.isoformat()}_{hashlib.md5(key.encode()).hexdigest()}.parquet"
+
+
+def _is_fresh(path: Path, end: date, max_age: float) -> bool:
+    """Return True if a cached file exists and is still valid for the range end."""
+    if not path.exists():
+        return False
+    age = time.time() - path.stat().st_mtime
+    # end is exclusive, but a range ending today can still hold the exchange's current
+    # session (time zones) or a bar yfinance revised after the close, so only earlier ends are final
+    if end < date.today():
+        return age < CACHE_RETENTION
+    return age < max_age
+
+
+def _missing_symbols(data: pd.DataFrame, symbols: Sequence[str]) -> list[str]:
+    """Return requested symbols whose columns are absent or all NaN (failed or rate-limited)."""
+    columns = data.columns
+    if isinstance(columns, pd.MultiIndex):
+        # group_by="ticker" puts symbols on level 0, group_by="column" on level 1
+        level = next(
+            (i for i in range(columns.nlevels) if set(symbols) & set(columns.get_level_values(i))),
+            None,
+        )
+        if level is None:
+            return list(symbols)
+        present = set(columns.get_level_values(level))
+        return [
+            symbol
+            for symbol in symbols
+            if symbol not in present or data.xs(symbol, axis=1, level=level).isna().all().all()
+        ]
+    if len(symbols) == 1 and symbols[0] not in columns:  # flat OHLCV frame for a single ticker
+        return [] if data.notna().any().any() else list(symbols)
+    return [symbol for symbol in symbols if symbol not in columns or data[symbol].isna().all()]
+
+
+def _prune(directory: Path) -> None:
+    """Delete cache files (and stray temp files) older than CACHE_RETENTION."""
+    cutoff = time.time() - CACHE_RETENTION
+    for entry in directory.iterdir():
+        try:
+            if entry.suffix in (".parquet", ".tmp") and entry.stat().st_mtime < cutoff:
+                entry.unlink()
+        except OSError:  # removed by a concurrent writer, or not ours to delete
+            pass
+
+
+def _write_parquet(data: pd.DataFrame, path: Path) -> None:
+    """Atomically write a DataFrame so concurrent readers never see a partial file."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        data.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+        # New ranges are written daily (moving end dates, new ticker sets); sweep on write
+        _prune(path.parent)
+    except OSError:  # read-only host: keep serving from the network
+        pass
+# ╰─────────────────────────────────────────────────────────────────╯
+
+
+# ╭─────────────────────────── Fetch Functions ───────────────────────────╮
+def clear_cache(open_ranges_only: bool = True) -> None:
+    """Delete cached files; by default only ranges ending today or later, which can still change."""
+    if not CACHE_DIR.exists():
+        return
+    today = date.today().isoformat()
+    for entry in CACHE_DIR.glob("*.parquet"):
+        if open_ranges_only and entry.name[:10] < today:  # ISO end-date prefix sorts as text
+            continue
+        try:
+            entry.unlink()
+        except OSError:  # already removed by a concurrent sweep
+            pass
+
+
+def download_history(
+    tickers: Sequence[str],
+    start: date,
+    end: date,
+    field: str | None = None,
+    max_age: float = TTL_OPEN_RANGE,
+    strict: bool = False,
+    **options: Any,
+) -> pd.DataFrame:
+    """
+    Download daily price history via yfinance, persisting results to disk.
+
+    Args:
+        tickers: Ticker symbols to download
+        start: Inclusive start date
+        end: Exclusive end date
+        field: Optional price field (e.g. "Close") to keep; other columns are
+            dropped before caching
+        max_age: Seconds a cached range ending today or later stays valid
+        strict: Raise IncompleteDownloadError instead of returning an incomplete
+            result, so memoizing callers (st.cache_*) do not keep it
+        **options: Extra keyword arguments forwarded to yf.download
+
+    Returns:
+        yf.download DataFrame, or a (dates x tickers) frame when field is given
+        (empty if nothing was returned). Results missing any requested symbol are
+        returned (or raised, when strict) but not cached.
+    """
+    symbols = sorted(tickers)
+    path = _cache_path(symbols, start, end, {**options, "field": field})
+    if _is_fresh(path, end, max_age):
+        try:
+            return pd.read_parquet(path)
+        except Exception:  # corrupt or foreign file: fall through and refetch
+            pass
+
+    data = yf.download(symbols, start=start, end=end, progress=False, **options)
+    if data is None:
+        data = pd.DataFrame()
+    if field is not None and not data.empty:
+        data = data[field]
+        if isinstance(data, pd.Series):
+            data = data.to_frame(name=symbols[0])
+    # yfinance reports per-symbol failures as all-NaN columns rather than raising;
+    # persisting those would pin the failure for as long as the range stays fresh
+    missing = symbols if data.empty else _missing_symbols(data, symbols)
+    if not missing:
+        _write_parquet(data, path)
+    elif strict:
+        raise IncompleteDownloadError(data, missing)
+    return data
+# ╰─────────────────────────────────────────────────────────────────╯